@@ -1,67 +1,332 @@
 import os
 import re
+import json
+import heapq
+import hashlib
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+SHARD_SIZE = 64 * 1024 * 1024  # Files larger than this are split into byte ranges
+CHECK_BLOCK_SIZE = 4096  # Bytes before the manifest offset hashed to detect rewritten files
+
+REVIEW_PATTERN = re.compile(r'CustomerID: (?P<CustomerID>[A-Z0-9]+), ProductID: (?P<ProductID>[A-Z0-9]+), ReviewDate: (?P<ReviewDate>\d{4}-\d{2}-\d{2}), ReviewRating: (?P<ReviewRating>[1-5]), ReviewText: "(?P<ReviewText>.+)"')
+# Same format, but the review text is only validated, never captured
+REVIEW_PATTERN_NO_TEXT = re.compile(r'CustomerID: (?P<CustomerID>[A-Z0-9]+), ProductID: (?P<ProductID>[A-Z0-9]+), ReviewDate: (?P<ReviewDate>\d{4}-\d{2}-\d{2}), ReviewRating: (?P<ReviewRating>[1-5]), ReviewText: ".+"')
+RATING_FIELDS = ('ProductID', 'ReviewRating')
+
+# Running aggregate for one product: review count, rating sum and a 1-5 rating histogram
+class RatingStats:
+    __slots__ = ('count', 'total', 'histogram')
+
+    def __init__(self, count=0, total=0, histogram=None):
+        self.count = count
+        self.total = total
+        self.histogram = histogram if histogram is not None else [0] * 5
+
+    def add(self, rating):
+        self.count += 1
+        self.total += rating
+        self.histogram[rating - 1] += 1
+
+    def merge(self, other):
+        self.count += other.count
+        self.total += other.total
+        for i, n in enumerate(other.histogram):
+            self.histogram[i] += n
+        return self
+
+    @property
+    def average(self):
+        return self.total / self.count if self.count else 0.0
+
+    def to_dict(self):
+        return {'count': self.count, 'total': self.total, 'histogram': list(self.histogram)}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['count'], data['total'], list(data['histogram']))
+
+    def __eq__(self, other):
+        return isinstance(other, RatingStats) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"RatingStats(count={self.count}, total={self.total}, histogram={self.histogram})"
+
+# Merge one {product_id: RatingStats} mapping into another
+def merge_product_ratings(product_ratings, other):
+    for product_id, stats in other.items():
+        if product_id in product_ratings:
+            product_ratings[product_id].merge(stats)
+        else:
+            product_ratings[product_id] = RatingStats().merge(stats)
+    return product_ratings
+
+# Aggregates and counters as a JSON-friendly dict and back
+def partial_results_to_dict(product_ratings, total_reviews, valid_reviews, invalid_reviews):
+    return {
+        'total_reviews': total_reviews,
+        'valid_reviews': valid_reviews,
+        'invalid_reviews': invalid_reviews,
+        'product_ratings': {product_id: stats.to_dict() for product_id, stats in product_ratings.items()}
+    }
+
+def partial_results_from_dict(data):
+    product_ratings = defaultdict(RatingStats)
+    for product_id, stats in data['product_ratings'].items():
+        product_ratings[product_id] = RatingStats.from_dict(stats)
+    return product_ratings, data['total_reviews'], data['valid_reviews'], data['invalid_reviews']
+
+# Save aggregates and counters as JSON so partial runs can be merged later
+def save_partial_results(file_path, product_ratings, total_reviews, valid_reviews, invalid_reviews):
+    with open(file_path, 'w') as file:
+        json.dump(partial_results_to_dict(product_ratings, total_reviews, valid_reviews, invalid_reviews), file)
+
+def load_partial_results(file_path):
+    with open(file_path, 'r') as file:
+        return partial_results_from_dict(json.load(file))
 
 def extract_review_data(line):
-    pattern = re.compile(r'CustomerID: ([A-Z0-9]+), ProductID: ([A-Z0-9]+), ReviewDate: (\d{4}-\d{2}-\d{2}), ReviewRating: (\d), ReviewText: "(.+)"')
-    match = pattern.match(line.strip())
+    match = REVIEW_PATTERN.match(line.strip())
     if match:
         customer_id, product_id, review_date, review_rating, review_text = match.groups()
-        review_rating = int(review_rating)
-        if 1 <= review_rating <= 5:
-            return {
-                'CustomerID': customer_id,
-                'ProductID': product_id,
-                'ReviewDate': review_date,
-                'ReviewRating': review_rating,
-                'ReviewText': review_text
-            }, None
+        return {
+            'CustomerID': customer_id,
+            'ProductID': product_id,
+            'ReviewDate': review_date,
+            'ReviewRating': int(review_rating),
+            'ReviewText': review_text
+        }, None
     return None, "Invalid format or rating"
 
-def process_files(directory):
+# Return only the requested fields as a tuple (None for an invalid line).
+# With fields=() the line is just validated and True is returned.
+def extract_review_fields(line, fields=RATING_FIELDS):
+    pattern = REVIEW_PATTERN if 'ReviewText' in fields else REVIEW_PATTERN_NO_TEXT
+    match = pattern.match(line.strip())
+    if not match:
+        return None
+    if not fields:
+        return True
+    values = match.group(*fields) if len(fields) > 1 else (match.group(fields[0]),)
+    if 'ReviewRating' in fields:
+        index = fields.index('ReviewRating')
+        values = values[:index] + (int(values[index]),) + values[index + 1:]
+    return values
+
+# Review files are read as bytes in every mode (serial, sharded and incremental) and each line is
+# decoded here, so all modes split lines only at b'\n' and see the same characters whatever the locale
+def decode_line(line):
+    return line.decode('utf-8', errors='replace')
+
+# Hot path used by process_files: (product_id, rating) or None
+def extract_rating(line):
+    match = REVIEW_PATTERN_NO_TEXT.match(line.strip())
+    if match:
+        return match.group('ProductID'), int(match.group('ReviewRating'))
+    return None
+
+# Review files in a directory, skipping excluded paths such as the summary file
+def review_files(directory, exclude=()):
+    excluded = {os.path.abspath(path) for path in exclude}
+    return [os.path.join(directory, filename) for filename in sorted(os.listdir(directory))
+            if filename.endswith('.txt') and os.path.abspath(os.path.join(directory, filename)) not in excluded]
+
+def process_files(directory, workers=None, shard_size=SHARD_SIZE, exclude=()):
+    if workers is not None and workers > 1:
+        return process_files_parallel(directory, workers, shard_size, exclude)
+
     total_reviews = valid_reviews = invalid_reviews = 0
-    product_ratings = defaultdict(list)
+    product_ratings = defaultdict(RatingStats)
     
-    for filename in os.listdir(directory):
-        if filename.endswith('.txt'):
-            with open(os.path.join(directory, filename), 'r') as file:
-                for line in file:
-                    total_reviews += 1
-                    review_data, error = extract_review_data(line)
-                    if review_data:
-                        valid_reviews += 1
-                        product_ratings[review_data['ProductID']].append(review_data['ReviewRating'])
-                    else:
-                        invalid_reviews += 1
+    for path in review_files(directory, exclude):
+        with open(path, 'rb') as file:
+            for line in file:
+                total_reviews += 1
+                review = extract_rating(decode_line(line))
+                if review:
+                    valid_reviews += 1
+                    product_ratings[review[0]].add(review[1])
+                else:
+                    invalid_reviews += 1
     
     return product_ratings, total_reviews, valid_reviews, invalid_reviews
 
+# Split every review file into (path, start, end) byte ranges of roughly shard_size bytes
+def make_shards(directory, shard_size=SHARD_SIZE, exclude=()):
+    shards = []
+    for path in review_files(directory, exclude):
+        size = os.path.getsize(path)
+        for start in range(0, max(size, 1), shard_size):
+            shards.append((path, start, min(start + shard_size, size)))
+    return shards
+
+# Worker: parse the lines that start inside [start, end) and return partial aggregates
+def process_shard(shard):
+    path, start, end = shard
+    total_reviews = valid_reviews = invalid_reviews = 0
+    product_ratings = {}
+
+    with open(path, 'rb') as file:
+        if start > 0:
+            # Skip the line straddling the boundary, the previous shard owns it
+            file.seek(start - 1)
+            file.readline()
+        while file.tell() < end:
+            line = file.readline()
+            if not line:
+                break
+            total_reviews += 1
+            review = extract_rating(decode_line(line))
+            if review:
+                valid_reviews += 1
+                if review[0] not in product_ratings:
+                    product_ratings[review[0]] = RatingStats()
+                product_ratings[review[0]].add(review[1])
+            else:
+                invalid_reviews += 1
+
+    return product_ratings, total_reviews, valid_reviews, invalid_reviews
+
+def process_files_parallel(directory, workers=None, shard_size=SHARD_SIZE, exclude=()):
+    total_reviews = valid_reviews = invalid_reviews = 0
+    product_ratings = defaultdict(RatingStats)
+
+    shards = make_shards(directory, shard_size, exclude)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for partial, total, valid, invalid in executor.map(process_shard, shards):
+            total_reviews += total
+            valid_reviews += valid
+            invalid_reviews += invalid
+            merge_product_ratings(product_ratings, partial)
+
+    return product_ratings, total_reviews, valid_reviews, invalid_reviews
+
+# Manifest of already-processed files and the merged aggregates, kept next to the summary file
+def get_manifest_path(summary_file_path):
+    return os.path.splitext(summary_file_path)[0] + '_manifest.json'
+
+def load_manifest(manifest_path):
+    if not os.path.exists(manifest_path):
+        return {}, defaultdict(RatingStats), 0, 0, 0
+    with open(manifest_path, 'r') as file:
+        data = json.load(file)
+    return (data['files'],) + partial_results_from_dict(data)
+
+def save_manifest(manifest_path, files, product_ratings, total_reviews, valid_reviews, invalid_reviews):
+    data = partial_results_to_dict(product_ratings, total_reviews, valid_reviews, invalid_reviews)
+    data['files'] = files
+    temp_path = manifest_path + '.tmp'
+    with open(temp_path, 'w') as file:
+        json.dump(data, file)
+    os.replace(temp_path, manifest_path)
+
+# Hash of the block just before offset, used to tell an append from a rewrite
+def block_hash(path, offset):
+    start = max(offset - CHECK_BLOCK_SIZE, 0)
+    with open(path, 'rb') as file:
+        file.seek(start)
+        return hashlib.sha256(file.read(offset - start)).hexdigest()
+
+# Parse the complete lines from offset on. Returns the partial aggregates, the offset just past
+# the last newline consumed and the unfinished last line (b'' if the file ends with a newline).
+def process_tail(path, offset):
+    total_reviews = valid_reviews = invalid_reviews = 0
+    product_ratings = {}
+    with open(path, 'rb') as file:
+        file.seek(offset)
+        for line in file:
+            if not line.endswith(b'\n'):
+                return (product_ratings, total_reviews, valid_reviews, invalid_reviews), offset, line
+            offset += len(line)
+            total_reviews += 1
+            review = extract_rating(decode_line(line))
+            if review:
+                valid_reviews += 1
+                if review[0] not in product_ratings:
+                    product_ratings[review[0]] = RatingStats()
+                product_ratings[review[0]].add(review[1])
+            else:
+                invalid_reviews += 1
+    return (product_ratings, total_reviews, valid_reviews, invalid_reviews), offset, b''
+
+# Only parse new files and the appended tails of known files, then merge into the saved state.
+# The manifest only covers complete lines; an unfinished last line (a writer caught mid-append) is
+# counted in this run's result but parsed again on the next run, once it is complete.
+def process_files_incremental(directory, manifest_path, exclude=()):
+    files, product_ratings, total_reviews, valid_reviews, invalid_reviews = load_manifest(manifest_path)
+    current = {path: os.stat(path) for path in review_files(directory, exclude)}
+
+    # A removed, truncated or rewritten file can't be subtracted from the aggregates, so start over
+    for path, entry in files.items():
+        stat = current.get(path)
+        if stat is not None and stat.st_size == entry['size'] and stat.st_mtime == entry['mtime']:
+            continue
+        if stat is None or stat.st_size < entry['offset'] or block_hash(path, entry['offset']) != entry['block_hash']:
+            files, product_ratings = {}, defaultdict(RatingStats)
+            total_reviews = valid_reviews = invalid_reviews = 0
+            break
+
+    unfinished = []
+    for path, stat in current.items():
+        offset = files.get(path, {}).get('offset', 0)
+        (partial, total, valid, invalid), offset, tail = process_tail(path, offset)
+        merge_product_ratings(product_ratings, partial)
+        total_reviews += total
+        valid_reviews += valid
+        invalid_reviews += invalid
+        if tail:
+            unfinished.append(tail)
+        files[path] = {'size': stat.st_size, 'mtime': stat.st_mtime, 'offset': offset, 'block_hash': block_hash(path, offset)}
+
+    save_manifest(manifest_path, files, product_ratings, total_reviews, valid_reviews, invalid_reviews)
+
+    if unfinished:
+        product_ratings = merge_product_ratings(defaultdict(RatingStats), product_ratings)
+        for line in unfinished:
+            total_reviews += 1
+            review = extract_rating(decode_line(line))
+            if review:
+                valid_reviews += 1
+                product_ratings[review[0]].add(review[1])
+            else:
+                invalid_reviews += 1
+    return product_ratings, total_reviews, valid_reviews, invalid_reviews
+
 def calculate_average_ratings(product_ratings):
-    return {product_id: sum(ratings) / len(ratings) for product_id, ratings in product_ratings.items()}
+    return {product_id: stats.average for product_id, stats in product_ratings.items()}
 
-def get_top_products(average_ratings, top_n=3):
-    return sorted(average_ratings.items(), key=lambda x: x[1], reverse=True)[:top_n]
+# Bounded-heap top-N selection. Products with fewer than min_reviews reviews are skipped.
+# tie_break='count' ranks equal averages by review count; otherwise ties keep input order.
+def get_top_products(product_ratings, top_n=3, min_reviews=1, tie_break=None):
+    candidates = ((product_id, stats) for product_id, stats in product_ratings.items() if stats.count >= min_reviews)
+    if tie_break == 'count':
+        key = lambda item: (item[1].average, item[1].count)
+    else:
+        key = lambda item: item[1].average
+    return [(product_id, stats.average) for product_id, stats in heapq.nlargest(top_n, candidates, key=key)]
 
-def write_summary(file_path, total_reviews, valid_reviews, invalid_reviews, top_products):
+def write_summary(file_path, total_reviews, valid_reviews, invalid_reviews, top_products, top_n=3):
     with open(file_path, 'w') as file:
         file.write(f"Total reviews processed: {total_reviews}\n")
         file.write(f"Total valid reviews: {valid_reviews}\n")
         file.write(f"Total invalid reviews: {invalid_reviews}\n")
-        file.write("Top 3 Products with Highest Average Ratings:\n")
+        file.write(f"Top {top_n} Products with Highest Average Ratings:\n")
         for product_id, avg_rating in top_products:
             file.write(f"Product ID: {product_id}, Average Rating: {avg_rating:.2f}\n")
 
-def main():
+def main(workers=None, incremental=False, top_n=3, min_reviews=1):
     directory = r'D:\Projects\RankMansi\Semesters\Sem-5\Lab-Advanced Python\directory_for_reviews'  # Path to your directory containing review files
     summary_file_path = r'D:\Projects\RankMansi\Semesters\Sem-5\Lab-Advanced Python\directory_for_reviews\summary.txt'
     
-    product_ratings, total_reviews, valid_reviews, invalid_reviews = process_files(directory)
-    
-    average_ratings = calculate_average_ratings(product_ratings)
+    if incremental:
+        manifest_path = get_manifest_path(summary_file_path)
+        product_ratings, total_reviews, valid_reviews, invalid_reviews = process_files_incremental(directory, manifest_path, exclude=[summary_file_path])
+    else:
+        product_ratings, total_reviews, valid_reviews, invalid_reviews = process_files(directory, workers, exclude=[summary_file_path])
     
-    top_products = get_top_products(average_ratings)
+    top_products = get_top_products(product_ratings, top_n, min_reviews)
     
-    write_summary(summary_file_path, total_reviews, valid_reviews, invalid_reviews, top_products)
+    write_summary(summary_file_path, total_reviews, valid_reviews, invalid_reviews, top_products, top_n)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
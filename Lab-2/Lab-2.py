@@ -1,4 +1,14 @@
 import csv
+import os
+import sys
+import threading
+from array import array
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+COMPACT_THRESHOLD = 10000  # Journal entries before folding them into a new trains.csv snapshot
 
 # Load Train Data
 def load_train_data(filename):
@@ -17,23 +27,164 @@ def load_train_data(filename):
             }
     return trains
 
+# Columnar train inventory: array-backed seat/fare columns, interned station ids and a route index.
+# It behaves like the trains dict (trains[train_id]['Available Seats'], items(), in), so the
+# existing seat, journal and report functions work on it unchanged. Seats are only booked through
+# a BookingEngine (book_in_order for bulk bookings), which takes the train locks and journals them.
+class TrainInventory:
+    FIELDS = ('Train Name', 'Source Station', 'Destination Station', 'Total Seats', 'Available Seats', 'Total Fare')
+
+    def __init__(self):
+        self.train_ids = []
+        self.rows = {}
+        self.names = []
+        self.stations = []
+        self.station_ids = {}
+        self.source = array('i')
+        self.destination = array('i')
+        self.total_seats = array('i')
+        self.available_seats = array('i')
+        self.fares = array('i')
+        self.routes = {}
+
+    def station_id(self, station):
+        if station not in self.station_ids:
+            self.station_ids[station] = len(self.stations)
+            self.stations.append(sys.intern(station))
+        return self.station_ids[station]
+
+    def add_train(self, train_id, name, source, destination, total_seats, available_seats, fare):
+        row = len(self.train_ids)
+        self.train_ids.append(train_id)
+        self.rows[train_id] = row
+        self.names.append(name)
+        self.source.append(self.station_id(source))
+        self.destination.append(self.station_id(destination))
+        self.total_seats.append(total_seats)
+        self.available_seats.append(available_seats)
+        self.fares.append(fare)
+        self.routes.setdefault((self.source[row], self.destination[row]), []).append(row)
+
+    # Train ids on a route with at least min_seats available, O(trains on that route)
+    def available_trains(self, source, destination, min_seats=1):
+        key = (self.station_ids.get(source), self.station_ids.get(destination))
+        return [self.train_ids[row] for row in self.routes.get(key, ()) if self.available_seats[row] >= min_seats]
+
+    def __contains__(self, train_id):
+        return train_id in self.rows
+
+    def __getitem__(self, train_id):
+        return TrainRecord(self, self.rows[train_id])
+
+    def __len__(self):
+        return len(self.train_ids)
+
+    def __iter__(self):
+        return iter(self.train_ids)
+
+    def items(self):
+        return ((train_id, TrainRecord(self, row)) for row, train_id in enumerate(self.train_ids))
+
+# Dict-like view of one inventory row
+class TrainRecord:
+    __slots__ = ('inventory', 'row')
+
+    def __init__(self, inventory, row):
+        self.inventory = inventory
+        self.row = row
+
+    def __getitem__(self, field):
+        inventory, row = self.inventory, self.row
+        if field == 'Available Seats':
+            return inventory.available_seats[row]
+        if field == 'Total Seats':
+            return inventory.total_seats[row]
+        if field == 'Total Fare':
+            return inventory.fares[row]
+        if field == 'Train Name':
+            return inventory.names[row]
+        if field == 'Source Station':
+            return inventory.stations[inventory.source[row]]
+        if field == 'Destination Station':
+            return inventory.stations[inventory.destination[row]]
+        raise KeyError(field)
+
+    def __setitem__(self, field, value):
+        if field != 'Available Seats':
+            raise KeyError(f"{field} is read-only")
+        self.inventory.available_seats[self.row] = value
+
+# Load Train Data into a TrainInventory
+def load_train_inventory(filename):
+    inventory = TrainInventory()
+    with open(filename, 'r') as file:
+        reader = csv.DictReader(file)
+        for row in reader:
+            inventory.add_train(
+                row['Train ID'],
+                row['Train Name'],
+                row['Source Station'],
+                row['Destination Station'],
+                int(row['Total Seats']),
+                int(row['Available Seats']),
+                int(row['Total Fare'])
+            )
+    return inventory
+
 # Load Passenger Data
 def load_passenger_data(filename):
     passengers = []
     try:
-        with open(filename, 'r') as file:
-            reader = csv.DictReader(file)
-            print("Column Names:", reader.fieldnames)
-            for row in reader:
-                passengers.append({
-                    'Passenger Name': row.get('Passenger Name', ''),
-                    'Train ID': row.get('Train ID', ''),
-                    'Number of Tickets': int(row.get('Number of Tickets', 0))
-                })
-    except Exception as e:
+        for chunk in iter_passenger_chunks(filename):
+            passengers.extend(chunk)
+    except OSError as e:
         print(f"Error reading passenger data: {e}")
     return passengers
 
+# Stream typed passenger records in chunks. Malformed rows are skipped and, if reject_file
+# is given, written there with their line number and the reason instead of aborting the load.
+# The reject file is only created when a row is rejected; one left over from an earlier load is removed.
+def iter_passenger_chunks(filename, chunk_size=10000, reject_file=None):
+    rejects = None
+    reject_writer = None
+    if reject_file is not None and os.path.exists(reject_file):
+        os.remove(reject_file)
+    try:
+        with open(filename, 'r', newline='') as file:
+            reader = csv.DictReader(file)
+            chunk = []
+            for row in reader:
+                try:
+                    if row['Number of Tickets'] is None:
+                        raise ValueError("missing Number of Tickets")
+                    num_tickets = int(row['Number of Tickets'])
+                    if num_tickets < 0:
+                        raise ValueError(f"negative ticket count {num_tickets}")
+                    if not row['Train ID']:
+                        raise ValueError("missing Train ID")
+                    passenger = {
+                        'Passenger Name': row['Passenger Name'] or '',
+                        'Train ID': row['Train ID'],
+                        'Number of Tickets': num_tickets
+                    }
+                except (KeyError, TypeError, ValueError) as e:
+                    if reject_file is not None:
+                        if reject_writer is None:
+                            rejects = open(reject_file, 'w', newline='')
+                            reject_writer = csv.writer(rejects)
+                            reject_writer.writerow(['Line', 'Error', 'Row'])
+                        reject_writer.writerow([reader.line_num, str(e), ','.join('' if value is None else str(value) for value in row.values())])
+                    continue
+                chunk.append(passenger)
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+    finally:
+        if rejects is not None:
+            rejects.close()
+
 # Checking Seat Availability
 def check_seat_availability(trains, train_id, num_tickets):
     if train_id in trains:
@@ -48,10 +199,168 @@ def update_seat_availability(trains, train_id, num_tickets):
         train = trains[train_id]
         train['Available Seats'] -= num_tickets
 
+# Booking engine: atomic check-and-book over the trains dict, guarded by striped per-train locks
+class BookingEngine:
+    def __init__(self, trains, num_locks=64, journal=None):
+        self.trains = trains
+        self.locks = [threading.Lock() for _ in range(num_locks)]
+        self.journal = journal
+
+    def lock_for(self, train_id):
+        return self.locks[hash(train_id) % len(self.locks)]
+
+    # With sync=True the journal is fsynced before returning, so a True result is durable
+    def try_book(self, train_id, num_tickets, passenger_name='', sync=True):
+        if train_id not in self.trains or num_tickets <= 0:
+            return False
+        with self.lock_for(train_id):
+            if not check_seat_availability(self.trains, train_id, num_tickets):
+                return False
+            update_seat_availability(self.trains, train_id, num_tickets)
+            if self.journal is not None:
+                self.journal.record(train_id, num_tickets, passenger_name)
+        if sync and self.journal is not None:
+            self.journal.flush()
+        return True
+
+    # Book passengers first come first served, returns (passenger, confirmed) pairs.
+    # The journal is fsynced once for the whole batch before the results are returned.
+    def book_in_order(self, passengers):
+        results = [(p, self.try_book(p['Train ID'], p['Number of Tickets'], p['Passenger Name'], sync=False)) for p in passengers]
+        if self.journal is not None:
+            self.journal.flush()
+        return results
+
+    # Book a whole passenger list through a thread pool, returns (passenger, confirmed) pairs in input order.
+    # Passengers race for seats, so when a train runs out a later passenger may win over an earlier one;
+    # use book_in_order when arrival order matters. The journal is fsynced once for the whole batch.
+    def book_passengers(self, passengers, workers=8):
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(lambda p: self.try_book(p['Train ID'], p['Number of Tickets'], p['Passenger Name'], sync=False), passengers))
+        if self.journal is not None:
+            self.journal.flush()
+        return list(zip(passengers, results))
+
+# Append-only booking journal (sequence number, Train ID, seats booked, passenger, timestamp),
+# fsynced in batches. Sequence numbers keep increasing across compactions, and each snapshot
+# records the last one it contains, so replay never applies an entry twice.
+class BookingJournal:
+    def __init__(self, filename, snapshot_seq=0, batch_size=100):
+        self.filename = filename
+        self.batch_size = batch_size
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.records = 0
+        self.seq = snapshot_seq
+        valid_end = 0
+        for end, seq, train_id, num_tickets in scan_journal(filename):
+            self.records += 1
+            self.seq = max(self.seq, seq)
+            valid_end = end
+        # Cut a torn tail off before appending, otherwise the next entry would be glued onto it
+        if os.path.exists(filename) and os.path.getsize(filename) > valid_end:
+            with open(filename, 'r+b') as file:
+                file.truncate(valid_end)
+                os.fsync(file.fileno())
+        self.file = open(filename, 'a', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+
+    def record(self, train_id, num_tickets, passenger_name):
+        with self.lock:
+            self.seq += 1
+            self.writer.writerow([self.seq, train_id, num_tickets, passenger_name, datetime.now().isoformat()])
+            self.pending += 1
+            self.records += 1
+            if self.pending >= self.batch_size:
+                self.sync()
+
+    # Caller must hold self.lock
+    def sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.pending = 0
+
+    def flush(self):
+        with self.lock:
+            if self.pending:
+                self.sync()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+# Valid journal entries as (byte offset just past the entry, seq, Train ID, seats booked).
+# Only newline-terminated lines are read: a last line without its newline was torn by a crash
+# and its booking was never confirmed, so it is skipped.
+def scan_journal(filename):
+    if not os.path.exists(filename):
+        return
+    with open(filename, 'rb') as file:
+        offset = 0
+
+        def complete_lines():
+            nonlocal offset
+            for line in file:
+                if not line.endswith(b'\n'):
+                    return
+                offset += len(line)
+                yield line.decode('utf-8')
+
+        for row in csv.reader(complete_lines()):
+            if len(row) != 5 or not row[0].isdigit() or not row[2].isdigit():
+                continue
+            yield offset, int(row[0]), row[1], int(row[2])
+
+# Valid journal entries as (seq, Train ID, seats booked)
+def read_journal(filename):
+    for end, seq, train_id, num_tickets in scan_journal(filename):
+        yield seq, train_id, num_tickets
+
+# Last journal sequence number folded into a trains.csv snapshot (0 if it has none)
+def load_snapshot_seq(filename):
+    with open(filename, 'r') as file:
+        for row in csv.DictReader(file):
+            return int(row.get('Journal Seq') or 0)
+    return 0
+
+# Replay the journal entries newer than the snapshot over the trains loaded from it
+def replay_journal(filename, trains, snapshot_seq=0):
+    replayed = 0
+    for seq, train_id, num_tickets in read_journal(filename):
+        if seq > snapshot_seq:
+            update_seat_availability(trains, train_id, num_tickets)
+            replayed += 1
+    return replayed
+
+# Fold the journal into a fresh trains.csv snapshot, then start an empty journal.
+# All train locks are held, so no booking can sit between its seat update and its journal entry.
+def compact_journal(trains_file, engine):
+    journal = engine.journal
+    for lock in engine.locks:
+        lock.acquire()
+    try:
+        with journal.lock:
+            if journal.pending:
+                journal.sync()
+            temp_file = trains_file + '.tmp'
+            write_updated_train_data(temp_file, engine.trains, journal_seq=journal.seq)
+            with open(temp_file, 'r+') as file:
+                os.fsync(file.fileno())
+            # A crash after this point leaves entries the snapshot already covers; replay skips them by seq
+            os.replace(temp_file, trains_file)
+            journal.file.truncate(0)
+            os.fsync(journal.file.fileno())
+            journal.records = 0
+    finally:
+        for lock in engine.locks:
+            lock.release()
+
 # Write Updated Train Data to CSV
-def write_updated_train_data(filename, trains):
+def write_updated_train_data(filename, trains, journal_seq=None):
     with open(filename, 'w', newline='') as file:
         fieldnames = ['Train ID', 'Train Name', 'Source Station', 'Destination Station', 'Total Seats', 'Available Seats', 'Total Fare']
+        if journal_seq is not None:
+            fieldnames.append('Journal Seq')
         writer = csv.DictWriter(file, fieldnames=fieldnames)
         
         writer.writeheader()
@@ -65,56 +374,97 @@ def write_updated_train_data(filename, trains):
                 'Available Seats': details['Available Seats'],
                 'Total Fare': details['Total Fare']
             }
+            if journal_seq is not None:
+                row['Journal Seq'] = journal_seq
             writer.writerow(row)
 
-# Reports
-def generate_reports(trains, passengers):
-    # Report 1
-    print()
-    print("Train Details Report:")
-    print("Train ID | Train Name | Source Station | Destination Station | Total Seats | Available Seats")
-    for train_id, details in trains.items():
-        print(f"{train_id} | {details['Train Name']} | {details['Source Station']} | {details['Destination Station']} | {details['Total Seats']} | {details['Available Seats']}")
-    print()
-    
-    # Report 2
-    revenue = {}
-    for passenger in passengers:
-        train_id = passenger['Train ID']
-        num_tickets = passenger['Number of Tickets']
-        if train_id in trains:
-            fare = trains[train_id]['Total Fare']
-            if train_id in revenue:
-                revenue[train_id] += num_tickets * fare
-            else:
-                revenue[train_id] = num_tickets * fare
-    
-    print("\nRevenue Report:")
-    print("Train ID | Total Revenue")
-    for train_id, total_revenue in revenue.items():
-        print(f"{train_id} | {total_revenue}")
+# Per-train columns as a DataFrame (read straight from the arrays for a TrainInventory)
+def train_frame(trains):
+    if isinstance(trains, TrainInventory):
+        stations = np.asarray(trains.stations, dtype=object)
+        return pd.DataFrame({
+            'Train ID': trains.train_ids,
+            'Train Name': trains.names,
+            'Source Station': stations[np.frombuffer(trains.source, dtype=np.intc)],
+            'Destination Station': stations[np.frombuffer(trains.destination, dtype=np.intc)],
+            # Copies, so the arrays are not pinned by a live buffer export and can still grow
+            'Total Seats': np.frombuffer(trains.total_seats, dtype=np.intc).copy(),
+            'Available Seats': np.frombuffer(trains.available_seats, dtype=np.intc).copy(),
+            'Total Fare': np.frombuffer(trains.fares, dtype=np.intc).copy()
+        })
+    frame = pd.DataFrame.from_dict(trains, orient='index')
+    return frame.rename_axis('Train ID').reset_index()
+
+# Confirmed and rejected tickets per train for one batch of (passenger, confirmed) results,
+# computed in one groupby pass
+def booking_totals(booking_results):
+    bookings = pd.DataFrame(
+        [(passenger['Train ID'], passenger['Number of Tickets'], confirmed) for passenger, confirmed in booking_results],
+        columns=['Train ID', 'Tickets', 'Confirmed']
+    )
+    confirmed = bookings['Confirmed'].to_numpy(dtype=bool)
+    tickets = bookings['Tickets'].to_numpy(dtype=np.int64)
+    bookings['Confirmed Tickets'] = np.where(confirmed, tickets, 0)
+    bookings['Rejected Tickets'] = np.where(confirmed, 0, tickets)
+    return bookings.groupby('Train ID')[['Confirmed Tickets', 'Rejected Tickets']].sum()
+
+# Empty booking totals, the starting point for add_booking_totals
+def empty_booking_totals():
+    return pd.DataFrame(columns=['Confirmed Tickets', 'Rejected Tickets'], dtype=np.int64).rename_axis('Train ID')
+
+# Fold one chunk's booking totals into the running totals (at most one row per train)
+def add_booking_totals(totals, chunk_totals):
+    return totals.add(chunk_totals, fill_value=0).astype(np.int64)
+
+# Reports: revenue and rejected demand from the booking totals, occupancy from the seat counts
+def build_report(trains, totals):
+    report = train_frame(trains).join(totals, on='Train ID')
+    report[['Confirmed Tickets', 'Rejected Tickets']] = report[['Confirmed Tickets', 'Rejected Tickets']].fillna(0).astype(np.int64)
+    report['Revenue'] = report['Confirmed Tickets'] * report['Total Fare']
+    report['Occupancy %'] = ((report['Total Seats'] - report['Available Seats']) / report['Total Seats'] * 100).round(2)
+    report['Rejected Revenue'] = report['Rejected Tickets'] * report['Total Fare']
+    return report
+
+# Write the report in one go, as JSON if the file name ends in .json and CSV otherwise
+def generate_reports(trains, totals, output_file='train_report.csv'):
+    report = build_report(trains, totals)
+    if output_file.endswith('.json'):
+        report.to_json(output_file, orient='records', indent=4)
+    else:
+        report.to_csv(output_file, index=False)
+    print(f"Train report saved to {output_file}")
+    return report
 
 # Main function
-def main():
+def main(print_bookings=True):
     trains_file = 'trains.csv'
     passengers_file = 'passengers.csv'
+    journal_file = 'trains_journal.csv'
+    rejects_file = 'passengers_rejects.csv'
     
-    trains = load_train_data(trains_file)
-    passengers = load_passenger_data(passengers_file)
+    trains = load_train_inventory(trains_file)
+    snapshot_seq = load_snapshot_seq(trains_file)
+    replay_journal(journal_file, trains, snapshot_seq)
     
-    for passenger in passengers:
-        train_id = passenger['Train ID']
-        num_tickets = passenger['Number of Tickets']
-        if check_seat_availability(trains, train_id, num_tickets):
-            update_seat_availability(trains, train_id, num_tickets)
-            print(f"Booking confirmed for {passenger['Passenger Name']} on Train {train_id}.")
-        else:
-            print(f"Insufficient seats for {passenger['Passenger Name']} on Train {train_id}.")
+    journal = BookingJournal(journal_file, snapshot_seq)
+    engine = BookingEngine(trains, journal=journal)
+    totals = empty_booking_totals()
+    for passengers in iter_passenger_chunks(passengers_file, reject_file=rejects_file):
+        booking_results = engine.book_in_order(passengers)
+        if print_bookings:
+            for passenger, confirmed in booking_results:
+                if confirmed:
+                    print(f"Booking confirmed for {passenger['Passenger Name']} on Train {passenger['Train ID']}.")
+                else:
+                    print(f"Insufficient seats for {passenger['Passenger Name']} on Train {passenger['Train ID']}.")
+        totals = add_booking_totals(totals, booking_totals(booking_results))
     
-    # Write the updated train data back to CSV
-    write_updated_train_data(trains_file, trains)
+    # Fold the journal back into trains.csv once it has grown large enough
+    if journal.records >= COMPACT_THRESHOLD:
+        compact_journal(trains_file, engine)
+    journal.close()
     
-    generate_reports(trains, passengers)
+    generate_reports(trains, totals)
 
 if __name__ == "__main__":
     main()
@@ -1,19 +1,57 @@
-import csv
-
-averages = []
-with open('student_grades.csv', 'r') as file:
-    reader = csv.DictReader(file)
-    for row in reader:
-        name = row['Name']
-        maths = int(row['Maths'])
-        science = int(row['Science'])
-        english = int(row['English'])
-        avg = (maths + science + english) / 3
-        averages.append([name, avg])
-
-with open('student_grades_average.csv', 'w', newline='') as file:
-    writer = csv.writer(file)
-    writer.writerow(['Name', 'Average'])
-    writer.writerows(averages)
-
-print("student_grades_average.csv created successfully.")
\ No newline at end of file
+import numpy as np
+import pandas as pd
+
+# Every numeric column except Name is treated as a subject
+def subject_columns(chunk, name_column='Name'):
+    return [column for column in chunk.columns if column != name_column and pd.api.types.is_numeric_dtype(chunk[column])]
+
+# Read the grades in chunks, write per-student averages chunk by chunk and return per-subject statistics.
+# weights is an optional {subject: weight} dict that adds a 'Weighted Average' column.
+def average_grades(input_file='student_grades.csv', output_file='student_grades_average.csv', chunksize=100000, weights=None, name_column='Name'):
+    subjects = None
+    count = total = total_squares = minimum = maximum = None
+    first = True
+
+    for chunk in pd.read_csv(input_file, chunksize=chunksize):
+        if subjects is None:
+            subjects = subject_columns(chunk, name_column)
+            if not subjects:
+                raise ValueError("No numeric subject columns found.")
+            count = np.zeros(len(subjects), dtype=np.int64)
+            total = np.zeros(len(subjects))
+            total_squares = np.zeros(len(subjects))
+            minimum = np.full(len(subjects), np.inf)
+            maximum = np.full(len(subjects), -np.inf)
+            if weights:
+                weight_vector = np.array([weights.get(subject, 0) for subject in subjects], dtype=np.float64)
+
+        grades = chunk[subjects].to_numpy(dtype=np.float64)
+
+        result = pd.DataFrame({name_column: chunk[name_column], 'Average': grades.mean(axis=1)})
+        if weights:
+            result['Weighted Average'] = grades @ weight_vector / weight_vector.sum()
+        result.to_csv(output_file, mode='w' if first else 'a', header=first, index=False)
+        first = False
+
+        count += len(grades)
+        total += grades.sum(axis=0)
+        total_squares += (grades ** 2).sum(axis=0)
+        minimum = np.minimum(minimum, grades.min(axis=0, initial=np.inf))
+        maximum = np.maximum(maximum, grades.max(axis=0, initial=-np.inf))
+
+    if subjects is None:
+        raise ValueError("No student rows found.")
+
+    mean = total / np.maximum(count, 1)
+    variance = np.maximum(total_squares / np.maximum(count, 1) - mean ** 2, 0)
+    return pd.DataFrame({
+        'Count': count,
+        'Mean': mean,
+        'Std': np.sqrt(variance),
+        'Min': minimum,
+        'Max': maximum
+    }, index=pd.Index(subjects, name='Subject'))
+
+if __name__ == "__main__":
+    average_grades('student_grades.csv', 'student_grades_average.csv')
+    print("student_grades_average.csv created successfully.")
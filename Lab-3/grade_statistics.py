@@ -0,0 +1,203 @@
+import json
+import numpy as np
+import pandas as pd
+
+# Exact mode: load the grades as a Name array and a {subject: float array} dict
+def load_grades(input_file='student_grades.csv', name_column='Name'):
+    data = pd.read_csv(input_file)
+    subjects = [column for column in data.columns if column != name_column and pd.api.types.is_numeric_dtype(data[column])]
+    return data[name_column].to_numpy(), {subject: data[subject].to_numpy(dtype=np.float64) for subject in subjects}
+
+# Percentiles (0-100, linear interpolation like np.percentile) using np.partition on just the needed ranks
+def exact_percentiles(values, percentiles):
+    values = np.asarray(values, dtype=np.float64)
+    positions = np.asarray(percentiles, dtype=np.float64) / 100 * (len(values) - 1)
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.ceil(positions).astype(np.int64)
+    selected = np.partition(values, np.unique(np.concatenate([lower, upper])))
+    return selected[lower] + (selected[upper] - selected[lower]) * (positions - lower)
+
+def exact_median(values):
+    return float(exact_percentiles(values, [50])[0])
+
+# Class rank of a score: 1 + number of strictly higher scores
+def rank_of(values, score):
+    return int(np.count_nonzero(np.asarray(values) > score)) + 1
+
+# Percentage of the class scoring below the score (ties count half)
+def percentile_of(values, score):
+    values = np.asarray(values)
+    below = np.count_nonzero(values < score)
+    equal = np.count_nonzero(values == score)
+    return (below + 0.5 * equal) / len(values) * 100
+
+# Indices of the k highest values, best first, via argpartition
+def top_k_indices(values, k=5):
+    values = np.asarray(values)
+    k = min(k, len(values))
+    if k == 0:
+        return np.empty(0, dtype=np.int64)
+    candidates = np.argpartition(values, len(values) - k)[len(values) - k:]
+    return candidates[np.argsort(-values[candidates], kind='stable')]
+
+# Per-subject median, quartiles, p90 and top-k students
+def exact_statistics(input_file='student_grades.csv', k=5, name_column='Name'):
+    names, grades = load_grades(input_file, name_column)
+    summary = {}
+    for subject, values in grades.items():
+        p25, p50, p75, p90 = exact_percentiles(values, [25, 50, 75, 90])
+        top = top_k_indices(values, k)
+        summary[subject] = {
+            'Median': p50,
+            'P25': p25,
+            'P75': p75,
+            'P90': p90,
+            'Top': [(names[i], values[i]) for i in top]
+        }
+    return summary
+
+# Streaming mode: merging t-digest. Values are buffered, then folded into at most ~compression centroids
+# using the k1 scale function, so memory stays bounded however many values are added.
+class TDigest:
+    def __init__(self, compression=100, buffer_size=100000):
+        self.compression = compression
+        self.buffer_size = buffer_size
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.buffer = []
+        self.buffered = 0
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.count += len(values)
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self.buffer.append(values)
+        self.buffered += len(values)
+        if self.buffered >= self.buffer_size:
+            self.compress()
+
+    def merge(self, other):
+        other.compress()
+        self.compress()
+        if other.count:
+            self.count += other.count
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self.fold(np.concatenate([self.means, other.means]), np.concatenate([self.weights, other.weights]))
+        return self
+
+    def compress(self):
+        if not self.buffer:
+            return
+        values = np.concatenate(self.buffer)
+        self.buffer = []
+        self.buffered = 0
+        # Equal values merge losslessly, which shrinks typical integer grade data a lot
+        unique, counts = np.unique(values, return_counts=True)
+        self.fold(np.concatenate([self.means, unique]), np.concatenate([self.weights, counts.astype(np.float64)]))
+
+    def scale(self, q):
+        return self.compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+
+    def fold(self, means, weights):
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        new_means, new_weights = [], []
+        current_mean, current_weight = means[0], weights[0]
+        done = 0.0
+        k_left = self.scale(0.0)
+        for mean, weight in zip(means[1:], weights[1:]):
+            if self.scale((done + current_weight + weight) / total) - k_left <= 1:
+                current_weight += weight
+                current_mean += (mean - current_mean) * weight / current_weight
+            else:
+                new_means.append(current_mean)
+                new_weights.append(current_weight)
+                done += current_weight
+                k_left = self.scale(done / total)
+                current_mean, current_weight = mean, weight
+        new_means.append(current_mean)
+        new_weights.append(current_weight)
+        self.means = np.array(new_means)
+        self.weights = np.array(new_weights)
+
+    # Interpolation knots: (cumulative weight, value) including the observed min and max
+    def knots(self):
+        self.compress()
+        centers = np.cumsum(self.weights) - self.weights / 2
+        return np.concatenate([[0], centers, [self.count]]), np.concatenate([[self.min], self.means, [self.max]])
+
+    # Approximate percentile, p in 0-100
+    def percentile(self, p):
+        if self.count == 0:
+            return np.nan
+        positions, values = self.knots()
+        return float(np.interp(p / 100 * self.count, positions, values))
+
+    # Approximate percentage of values below a score
+    def percentile_of(self, score):
+        if self.count == 0:
+            return np.nan
+        positions, values = self.knots()
+        return float(np.interp(score, values, positions)) / self.count * 100
+
+    def to_dict(self):
+        self.compress()
+        return {
+            'compression': self.compression,
+            'count': self.count,
+            'min': self.min,
+            'max': self.max,
+            'means': self.means.tolist(),
+            'weights': self.weights.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        digest = cls(data['compression'])
+        digest.count = data['count']
+        digest.min = data['min']
+        digest.max = data['max']
+        digest.means = np.array(data['means'], dtype=np.float64)
+        digest.weights = np.array(data['weights'], dtype=np.float64)
+        return digest
+
+# Single pass over a grades file, returns {subject: TDigest}
+def sketch_grades(input_file='student_grades.csv', chunksize=100000, compression=100, name_column='Name'):
+    sketches = None
+    for chunk in pd.read_csv(input_file, chunksize=chunksize):
+        if sketches is None:
+            subjects = [column for column in chunk.columns if column != name_column and pd.api.types.is_numeric_dtype(chunk[column])]
+            sketches = {subject: TDigest(compression) for subject in subjects}
+        for subject, sketch in sketches.items():
+            sketch.update(chunk[subject].to_numpy(dtype=np.float64))
+    return sketches or {}
+
+# Merge {subject: TDigest} sketches from several files into the first one
+def merge_sketches(sketches, other):
+    for subject, sketch in other.items():
+        if subject in sketches:
+            sketches[subject].merge(sketch)
+        else:
+            sketches[subject] = TDigest(sketch.compression).merge(sketch)
+    return sketches
+
+def save_sketches(sketches, output_file):
+    with open(output_file, 'w') as file:
+        json.dump({subject: sketch.to_dict() for subject, sketch in sketches.items()}, file)
+
+def load_sketches(input_file):
+    with open(input_file, 'r') as file:
+        return {subject: TDigest.from_dict(data) for subject, data in json.load(file).items()}
+
+if __name__ == "__main__":
+    for subject, stats in exact_statistics('student_grades.csv').items():
+        print(f"{subject}: median {stats['Median']:.2f}, P90 {stats['P90']:.2f}, top {stats['Top'][0][0]}")
@@ -1,33 +1,176 @@
 import os
+import json
+import hashlib
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 
-def read_files(directory):
-    data = []
-    for file in os.listdir(directory):
-        if file.endswith('.csv') and file != 'product_names.csv':
-            path = os.path.join(directory, file)
-            df = pd.read_csv(path)
-            data.append(df)
-    if not data:
+# Only the columns the summary needs, with narrow dtypes
+SALES_COLUMNS = ['Date', 'Product ID', 'Quantity sold']
+SALES_DTYPES = {'Store ID': 'category', 'Product ID': 'category', 'Quantity sold': 'int32'}
+
+def sales_files(directory):
+    return [os.path.join(directory, file) for file in sorted(os.listdir(directory))
+            if file.endswith('.csv') and file not in ('product_names.csv', 'sales_summary.csv')]
+
+# pyarrow's multithreaded CSV parser when it is installed, pandas' C parser otherwise
+def default_engine():
+    return 'pyarrow' if importlib.util.find_spec('pyarrow') is not None else 'c'
+
+def read_sales_file(path, usecols=SALES_COLUMNS, engine='c'):
+    dtypes = {column: dtype for column, dtype in SALES_DTYPES.items() if column in usecols}
+    parse_dates = ['Date'] if 'Date' in usecols else False
+    return pd.read_csv(path, usecols=usecols, dtype=dtypes, parse_dates=parse_dates, engine=engine)
+
+def read_files(directory, workers=None, usecols=SALES_COLUMNS, engine=None):
+    files = sales_files(directory)
+    if not files:
         raise ValueError("No CSV files found in the specified directory.")
+    engine = engine or default_engine()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        data = list(executor.map(lambda path: read_sales_file(path, usecols, engine), files))
+
+    # Give every file the same categories so concat keeps the categorical dtype
+    for column in data[0].columns:
+        if isinstance(data[0][column].dtype, pd.CategoricalDtype):
+            categories = pd.api.types.union_categoricals([df[column] for df in data]).categories
+            for df in data:
+                df[column] = df[column].cat.set_categories(categories)
     return pd.concat(data, ignore_index=True)
 
 def sum_sales(data):
-    return data.groupby('Product ID')['Quantity sold'].sum().reset_index(name='Total Quantity Sold')
+    return data.groupby('Product ID', observed=True)['Quantity sold'].sum().reset_index(name='Total Quantity Sold')
 
 def average_sales(sales, data):
-    data['Date'] = pd.to_datetime(data['Date'])
-    data['Month-Year'] = data['Date'].dt.to_period('M')
-    monthly_sales = data.groupby(['Product ID', 'Month-Year'])['Quantity sold'].sum().reset_index()
-    monthly_avg_sales = monthly_sales.groupby('Product ID')['Quantity sold'].mean().reset_index(name='Average Sold Per Month')
+    month = pd.to_datetime(data['Date']).dt.to_period('M').rename('Month-Year')
+    monthly_sales = data.groupby([data['Product ID'], month], observed=True)['Quantity sold'].sum().reset_index()
+    monthly_avg_sales = monthly_sales.groupby('Product ID', observed=True)['Quantity sold'].mean().reset_index(name='Average Sold Per Month')
     return sales.merge(monthly_avg_sales, on='Product ID')
 
+# Out-of-core path: stream each file in chunks and keep only (Product ID, Month-Year) totals
+def read_sales_chunks(path, chunksize):
+    return pd.read_csv(path, usecols=SALES_COLUMNS, dtype={'Product ID': str, 'Quantity sold': 'int64'}, parse_dates=['Date'], chunksize=chunksize)
+
+def aggregate_sales_file(path, chunksize=1000000):
+    monthly = None
+    for chunk in read_sales_chunks(path, chunksize):
+        month = chunk['Date'].dt.to_period('M').astype(str).rename('Month-Year')
+        partial = chunk.groupby([chunk['Product ID'], month])['Quantity sold'].sum()
+        monthly = partial if monthly is None else monthly.add(partial, fill_value=0)
+    if monthly is None:
+        index = pd.MultiIndex.from_arrays([[], []], names=['Product ID', 'Month-Year'])
+        return pd.Series(dtype='int64', index=index, name='Quantity sold')
+    return monthly.astype('int64')
+
+def aggregate_monthly_sales(directory, chunksize=1000000):
+    files = sales_files(directory)
+    if not files:
+        raise ValueError("No CSV files found in the specified directory.")
+    monthly = None
+    for path in files:
+        partial = aggregate_sales_file(path, chunksize)
+        monthly = partial if monthly is None else monthly.add(partial, fill_value=0)
+    return monthly.astype('int64')
+
+# Materialised cube: per-file (Product ID, Month-Year) quantities, stored as Parquet when pyarrow
+# is available (pickle otherwise) with a manifest of the source files it was built from
+def cube_path(directory):
+    extension = '.parquet' if importlib.util.find_spec('pyarrow') is not None else '.pkl'
+    return os.path.join(directory, 'sales_cube' + extension)
+
+def load_cube(path):
+    if not os.path.exists(path):
+        return pd.DataFrame({'File': pd.Series(dtype=str), 'Product ID': pd.Series(dtype=str),
+                             'Month-Year': pd.Series(dtype=str), 'Quantity sold': pd.Series(dtype='int64')})
+    return pd.read_parquet(path) if path.endswith('.parquet') else pd.read_pickle(path)
+
+def save_cube(cube, path):
+    temp_path = path + '.tmp'
+    if path.endswith('.parquet'):
+        cube.to_parquet(temp_path, index=False)
+    else:
+        cube.to_pickle(temp_path)
+    os.replace(temp_path, path)
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+# Fold new or changed sales files into the cube and drop files that disappeared.
+# Unchanged size and mtime skip the file; otherwise its content hash decides.
+def refresh_cube(directory, chunksize=1000000):
+    path = cube_path(directory)
+    manifest_path = os.path.join(directory, 'sales_cube_manifest.json')
+    cube = load_cube(path)
+    manifest = {}
+    if os.path.exists(manifest_path) and os.path.exists(path):
+        with open(manifest_path, 'r') as file:
+            manifest = json.load(file)
+
+    files = {os.path.basename(file): file for file in sales_files(directory)}
+    stale = [name for name in manifest if name not in files]
+    fresh = []
+    for name, file in files.items():
+        stat = os.stat(file)
+        entry = manifest.get(name)
+        if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime:
+            continue
+        digest = file_digest(file)
+        if not entry or entry['sha256'] != digest:
+            stale.append(name)
+            monthly = aggregate_sales_file(file, chunksize).reset_index()
+            monthly.insert(0, 'File', name)
+            fresh.append(monthly)
+        manifest[name] = {'size': stat.st_size, 'mtime': stat.st_mtime, 'sha256': digest}
+
+    if stale or fresh:
+        cube = pd.concat([cube[~cube['File'].isin(stale)]] + fresh, ignore_index=True)
+        for name in stale:
+            if name not in files:
+                del manifest[name]
+        save_cube(cube, path)
+    with open(manifest_path, 'w') as file:
+        json.dump(manifest, file, indent=4)
+    return cube
+
+# Monthly totals across all files in the cube, ready for summarise_monthly_sales
+def cube_monthly_sales(cube):
+    return cube.groupby(['Product ID', 'Month-Year'])['Quantity sold'].sum()
+
+# Same output as sum_sales followed by average_sales, built from the monthly totals
+def summarise_monthly_sales(monthly):
+    by_product = monthly.groupby(level='Product ID')
+    return pd.DataFrame({
+        'Total Quantity Sold': by_product.sum(),
+        'Average Sold Per Month': by_product.mean()
+    }).rename_axis('Product ID').reset_index()
+
 def top_products(sales):
     return sales.sort_values(by='Total Quantity Sold', ascending=False).head(5)
 
+# Product catalogue cache: {path: ((mtime, size), names indexed by Product ID)}
+PRODUCT_NAMES_CACHE = {}
+
+# Load the catalogue once and reload it only when the file changes
+def load_product_names(product_file):
+    stat = os.stat(product_file)
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = PRODUCT_NAMES_CACHE.get(product_file)
+    if cached is None or cached[0] != version:
+        names = pd.read_csv(product_file, dtype=str).set_index('Product ID')['Product Name']
+        names = names[~names.index.duplicated(keep='first')]
+        cached = PRODUCT_NAMES_CACHE[product_file] = (version, names)
+    return cached[1]
+
+# Attach names by index lookup; like the old inner merge, rows without a known product are dropped
 def add_names(sales, product_file):
-    names = pd.read_csv(product_file)
-    return sales.merge(names, on='Product ID')
+    names = load_product_names(product_file)
+    product_names = names.reindex(sales['Product ID'].astype(str)).to_numpy()
+    result = sales.assign(**{'Product Name': product_names})
+    return result[result['Product Name'].notna()].reset_index(drop=True)
 
 def save_summary(final_data, output_file):
     final_data.to_csv(output_file, index=False)
@@ -38,11 +181,9 @@ def main():
     output_file = os.path.join(directory, 'sales_summary.csv')
     
     try:
-        data = read_files(directory)
-        
-        sales = sum_sales(data)
+        cube = refresh_cube(directory)
         
-        sales = average_sales(sales, data)
+        sales = summarise_monthly_sales(cube_monthly_sales(cube))
         
         top_sales = top_products(sales)
         
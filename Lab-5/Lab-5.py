@@ -1,5 +1,49 @@
 import os
+import gzip
 import json
+from array import array
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+# Use a faster JSON parser when one is installed
+try:
+    import orjson
+    parse_json = orjson.loads
+except ImportError:
+    orjson = None
+    parse_json = json.loads
+
+# Incremental parser for huge JSON arrays, optional
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Optional summary output backends
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+SUMMARY_FIELDS = ["total_confirmed", "total_deaths", "total_recovered", "total_active"]
+
+LARGE_FILE_SIZE = 64 * 1024 * 1024  # Files above this are streamed instead of parsed in one go
+READ_SIZE = 1024 * 1024
+
+# The only fields the statistics need from each snapshot
+CovidRecord = namedtuple('CovidRecord', ['country', 'date', 'confirmed', 'deaths', 'recovered'])
 
 # Function to read all JSON files in the given directory and its subdirectories
 def read_json_files(directory):
@@ -11,14 +55,97 @@ def read_json_files(directory):
                     data.append(json.load(json_file))
     return data
 
+# Project a full snapshot document down to a CovidRecord
+def project_entry(entry):
+    return CovidRecord(
+        entry["country"],
+        entry.get("date"),
+        entry["confirmed_cases"]["total"],
+        entry["deaths"]["total"],
+        entry["recovered"]["total"]
+    )
+
+# Worker: parse one file (single snapshot, JSON array or NDJSON) and keep only the projected fields
+def scan_json_file(path):
+    return [project_entry(entry) for entry in iter_json_entries(path)]
+
+# Stream the elements of a top-level JSON array without loading the whole file
+def iter_json_array(json_file):
+    if ijson is not None:
+        yield from ijson.items(json_file.buffer, 'item')
+        return
+    decoder = json.JSONDecoder()
+    buffer = json_file.read(READ_SIZE).lstrip()
+    if not buffer.startswith('['):
+        raise ValueError("Expected a JSON array")
+    pos = 1
+    eof = False
+    while True:
+        # Skip separators between elements
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+            pos += 1
+        if pos < len(buffer) and buffer[pos] == ']':
+            return
+        try:
+            if pos >= len(buffer):
+                raise json.JSONDecodeError("Need more data", buffer, pos)
+            entry, pos = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            more = json_file.read(READ_SIZE)
+            eof = not more
+            buffer = buffer[pos:] + more
+            pos = 0
+            continue
+        yield entry
+
+# Yield every snapshot in a file one at a time: a single object, a JSON array or NDJSON
+def iter_json_entries(path):
+    with open(path, 'r') as json_file:
+        first = json_file.read(1)
+        while first and first.isspace():
+            first = json_file.read(1)
+        if not first:
+            return
+        json_file.seek(0)
+        if first == '[':
+            yield from iter_json_array(json_file)
+            return
+        # NDJSON if the first line is a complete object, otherwise one (pretty-printed) document
+        first_line = json_file.readline()
+        try:
+            entry = parse_json(first_line)
+        except ValueError:
+            json_file.seek(0)
+            yield parse_json(json_file.read())
+            return
+        yield entry
+        for line in json_file:
+            if line.strip():
+                yield parse_json(line)
+
+# Stream CovidRecords from every JSON file. Small files are parsed in parallel by a process pool,
+# large ones are streamed entry by entry, so memory stays bounded by the biggest small file.
+def scan_json_files(directory, workers=None, chunksize=64):
+    paths = [os.path.join(root, file) for root, dirs, files in os.walk(directory) for file in files if file.endswith((".json", ".ndjson", ".jsonl"))]
+    small = [path for path in paths if os.path.getsize(path) <= LARGE_FILE_SIZE]
+    large = [path for path in paths if os.path.getsize(path) > LARGE_FILE_SIZE]
+    if small:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for file_records in executor.map(scan_json_file, small, chunksize=chunksize):
+                yield from file_records
+    for path in large:
+        for entry in iter_json_entries(path):
+            yield project_entry(entry)
+
 # Function to calculate statistics for each country
 def calculate_statistics(covid_data):
     summary = {}
     for entry in covid_data:
-        country = entry["country"]
-        confirmed = entry["confirmed_cases"]["total"]
-        deaths = entry["deaths"]["total"]
-        recovered = entry["recovered"]["total"]
+        if isinstance(entry, dict):
+            entry = project_entry(entry)
+        country, date, confirmed, deaths, recovered = entry
         active_cases = confirmed - deaths - recovered
         
         if country not in summary:
@@ -36,30 +163,233 @@ def calculate_statistics(covid_data):
     
     return summary
 
-# Function to get top 5 countries by confirmed cases
-def get_top_5_countries(summary, lowest=False):
-    sorted_countries = sorted(summary.items(), key=lambda x: x[1]["total_confirmed"], reverse=not lowest)
-    return sorted_countries[:5]
+# Day number of an ISO date (NaT, the smallest int64, when the record has no date)
+def date_to_days(date):
+    return int(np.datetime64(date, 'D').astype(np.int64))
+
+# Struct-of-arrays store of country snapshots, countries interned to integer ids.
+# By default only the latest snapshot per country is kept, one row per country updated in place
+# (later arrivals win on the same date). With time_series=True every record is kept so that
+# time_series() can build one row per country and date; dates are stored as day numbers.
+class CountryStats:
+    def __init__(self, time_series=False):
+        self.keep_records = time_series
+        self.country_ids = {}
+        self.countries = []
+        self.country = array('i')
+        self.dates = array('q')
+        self.confirmed = array('q')
+        self.deaths = array('q')
+        self.recovered = array('q')
+
+    @classmethod
+    def from_records(cls, records, time_series=False):
+        stats = cls(time_series)
+        for record in records:
+            stats.add(record)
+        return stats
+
+    def add(self, record):
+        if isinstance(record, dict):
+            record = project_entry(record)
+        day = date_to_days(record.date)
+        country_id = self.country_ids.get(record.country)
+        if country_id is None:
+            country_id = self.country_ids[record.country] = len(self.countries)
+            self.countries.append(record.country)
+        elif not self.keep_records:
+            if day >= self.dates[country_id]:
+                self.dates[country_id] = day
+                self.confirmed[country_id] = record.confirmed
+                self.deaths[country_id] = record.deaths
+                self.recovered[country_id] = record.recovered
+            return
+        self.country.append(country_id)
+        self.dates.append(day)
+        self.confirmed.append(record.confirmed)
+        self.deaths.append(record.deaths)
+        self.recovered.append(record.recovered)
+
+    def metrics(self):
+        return np.column_stack([
+            np.frombuffer(self.confirmed, dtype=np.int64),
+            np.frombuffer(self.deaths, dtype=np.int64),
+            np.frombuffer(self.recovered, dtype=np.int64)
+        ])
+
+    # Rows sorted by (country, day number, arrival order), plus the metrics as an (n, 3) array
+    def sorted_columns(self):
+        country = np.frombuffer(self.country, dtype=np.intc).astype(np.int64)
+        dates = np.frombuffer(self.dates, dtype=np.int64)
+        order = np.lexsort((np.arange(len(country)), dates, country))
+        return country[order], dates[order], self.metrics()[order]
+
+    # Latest snapshot per country: (country ids, metrics)
+    def latest(self):
+        if not self.keep_records:
+            return np.arange(len(self.countries)), self.metrics()
+        country, dates, metrics = self.sorted_columns()
+        last = np.ones(len(country), dtype=bool)
+        last[:-1] = country[1:] != country[:-1]
+        return country[last], metrics[last]
+
+    def summary(self):
+        country, metrics = self.latest()
+        return {self.countries[country_id]: country_totals(row) for country_id, row in zip(country, metrics)}
+
+    # One row per country and date with daily deltas (0 on a country's first day)
+    # and a rolling mean of those deltas over the last `window` rows of the same country
+    def time_series(self, window=7):
+        if not self.keep_records:
+            raise ValueError("time_series() needs a CountryStats built with time_series=True.")
+        country, dates, metrics = self.sorted_columns()
+        last = np.ones(len(country), dtype=bool)
+        last[:-1] = (country[1:] != country[:-1]) | (dates[1:] != dates[:-1])
+        country, dates, metrics = country[last], dates[last], metrics[last]
+
+        n = len(country)
+        starts = np.ones(n, dtype=bool)
+        starts[1:] = country[1:] != country[:-1]
+        deltas = np.diff(metrics, axis=0, prepend=metrics[:1])
+        deltas[starts] = 0
+
+        index = np.arange(n)
+        group_start = np.maximum.accumulate(np.where(starts, index, 0))
+        lower = np.maximum(index - window + 1, group_start)
+        cumulative = np.vstack([np.zeros((1, 3), dtype=np.int64), np.cumsum(deltas, axis=0)])
+        rolling = (cumulative[index + 1] - cumulative[lower]) / (index - lower + 1)[:, None]
+
+        return {
+            'country': np.array(self.countries, dtype=object)[country],
+            'date': dates.astype('datetime64[D]'),
+            'confirmed': metrics[:, 0],
+            'deaths': metrics[:, 1],
+            'recovered': metrics[:, 2],
+            'new_confirmed': deltas[:, 0],
+            'new_deaths': deltas[:, 1],
+            'new_recovered': deltas[:, 2],
+            'rolling_new_confirmed': rolling[:, 0],
+            'rolling_new_deaths': rolling[:, 1],
+            'rolling_new_recovered': rolling[:, 2]
+        }
+
+# Summary entry for one (confirmed, deaths, recovered) row
+def country_totals(row):
+    confirmed, deaths, recovered = (int(value) for value in row)
+    return {
+        "total_confirmed": confirmed,
+        "total_deaths": deaths,
+        "total_recovered": recovered,
+        "total_active": confirmed - deaths - recovered
+    }
+
+# Indices of the k largest (or smallest) values; ties keep input order.
+# np.partition finds the k-th key, then everything better than it plus all ties on it is sorted by (key, index).
+def top_k_indices(values, k, lowest=False):
+    k = min(k, len(values))
+    if k == 0:
+        return np.empty(0, dtype=np.int64)
+    keys = values if lowest else -values
+    boundary = np.partition(keys, k - 1)[k - 1]
+    candidates = np.flatnonzero(keys <= boundary)
+    return candidates[np.lexsort((candidates, keys[candidates]))[:k]]
+
+# Function to get top 5 countries by confirmed cases, from a CountryStats store or a summary dict
+def get_top_5_countries(summary, lowest=False, k=5):
+    if isinstance(summary, CountryStats):
+        country, metrics = summary.latest()
+        return [(summary.countries[country[i]], country_totals(metrics[i])) for i in top_k_indices(metrics[:, 0], k, lowest)]
+    countries = list(summary)
+    confirmed = np.array([summary[country]["total_confirmed"] for country in countries], dtype=np.int64)
+    return [(countries[i], summary[countries[i]]) for i in top_k_indices(confirmed, k, lowest)]
 
 # Function to save summary report to a JSON file
 def save_summary_to_json(summary, filename="covid19_summary.json"):
     with open(filename, 'w') as json_file:
         json.dump(summary, json_file, indent=4)
 
+# Work out (format, compression) from a name like summary.msgpack.zst when they are not given
+def summary_file_format(filename, format=None, compression=None):
+    base = filename
+    if base.endswith('.gz'):
+        base, detected = base[:-3], 'gzip'
+    elif base.endswith('.zst'):
+        base, detected = base[:-4], 'zstd'
+    else:
+        detected = None
+    extension = os.path.splitext(base)[1].lstrip('.')
+    return format or {'msgpack': 'msgpack', 'parquet': 'parquet'}.get(extension, 'json'), compression or detected
+
+def require(module, name):
+    if module is None:
+        raise ImportError(f"{name} is required for this summary format")
+
+# Open a binary stream, optionally through a gzip or zstd streaming (de)compressor
+def open_summary_file(filename, mode, compression=None):
+    if compression == 'gzip':
+        return gzip.open(filename, mode)
+    if compression == 'zstd':
+        require(zstandard, 'zstandard')
+        if 'w' in mode:
+            return zstandard.ZstdCompressor().stream_writer(open(filename, mode))
+        return zstandard.ZstdDecompressor().stream_reader(open(filename, mode))
+    return open(filename, mode)
+
+# Function to save the summary as compact JSON, MessagePack or Parquet, optionally gzip/zstd compressed
+def save_summary(summary, filename="covid19_summary.json", format=None, compression=None):
+    format, compression = summary_file_format(filename, format, compression)
+    temp_filename = filename + '.tmp'
+    if format == 'parquet':
+        # Parquet compresses column pages itself
+        require(pyarrow, 'pyarrow')
+        columns = {"country": list(summary)}
+        for field in SUMMARY_FIELDS:
+            columns[field] = [stats[field] for stats in summary.values()]
+        pyarrow.parquet.write_table(pyarrow.table(columns), temp_filename, compression=compression or 'snappy')
+    else:
+        if format == 'msgpack':
+            require(msgpack, 'msgpack')
+            data = msgpack.packb(summary)
+        elif orjson is not None:
+            data = orjson.dumps(summary)
+        else:
+            data = json.dumps(summary, separators=(',', ':')).encode('utf-8')
+        with open_summary_file(temp_filename, 'wb', compression) as summary_file:
+            summary_file.write(data)
+    os.replace(temp_filename, filename)
+
+# Function to load a summary written by save_summary (or save_summary_to_json)
+def load_summary(filename="covid19_summary.json", format=None, compression=None):
+    format, compression = summary_file_format(filename, format, compression)
+    if format == 'parquet':
+        require(pyarrow, 'pyarrow')
+        columns = pyarrow.parquet.read_table(filename).to_pydict()
+        return {
+            country: {field: columns[field][i] for field in SUMMARY_FIELDS}
+            for i, country in enumerate(columns["country"])
+        }
+    with open_summary_file(filename, 'rb', compression) as summary_file:
+        data = summary_file.read()
+    if format == 'msgpack':
+        require(msgpack, 'msgpack')
+        return msgpack.unpackb(data)
+    return parse_json(data)
+
 # Main function
 def main():
     # Specify the directory containing the JSON files
     data_directory = 'covid_data/'
     
-    # Step 1: Read all JSON files
-    covid_data = read_json_files(data_directory)
+    # Step 1: Scan all JSON files in parallel, keeping only the fields we need
+    covid_data = scan_json_files(data_directory)
     
-    # Step 2: Calculate statistics for each country
-    summary = calculate_statistics(covid_data)
+    # Step 2: Calculate statistics for each country, the latest snapshot of a country wins
+    stats = CountryStats.from_records(covid_data)
+    summary = stats.summary()
     
     # Step 3: Determine top 5 countries with highest and lowest confirmed cases
-    top_5_highest = get_top_5_countries(summary)
-    top_5_lowest = get_top_5_countries(summary, lowest=True)
+    top_5_highest = get_top_5_countries(stats)
+    top_5_lowest = get_top_5_countries(stats, lowest=True)
     
     print("Top 5 countries with the highest confirmed cases:")
     for country, stats in top_5_highest:
@@ -69,8 +399,8 @@ def main():
     for country, stats in top_5_lowest:
         print(f"{country}: {stats['total_confirmed']} confirmed cases")
     
-    # Step 4: Save summary report to JSON file
-    save_summary_to_json(summary)
+    # Step 4: Save summary report as compact JSON
+    save_summary(summary)
 
 if __name__ == "__main__":
     main()
@@ -1,8 +1,15 @@
 import os
+import re
+import json
+import mmap
+import hashlib
 import logging
 import shutil
+import string
 from collections import Counter
-from wordcloud import WordCloud
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from wordcloud import WordCloud, STOPWORDS
 import matplotlib.pyplot as plt
 
 # Custom Exception Classes
@@ -59,37 +66,150 @@ def character_frequency(text):
             frequency[char] = frequency.get(char, 0) + 1
     return frequency
 
+CHUNK_SIZE = 1024 * 1024  # Characters read per chunk by analyze_text_file
+PUNCTUATION = string.punctuation + '\u201c\u201d\u2018\u2019'
+
+# Normalised form of a word for word frequencies: lowercase, surrounding punctuation removed
+def normalise_word(word):
+    return word.strip(PUNCTUATION).lower()
+
+# Single streaming pass over the file: word count, character frequency and word frequency.
+# The text decoder handles multibyte characters split across chunks, and a word cut at the end of
+# a chunk is carried over to the next one. Returns None for an empty file.
+def analyze_text_file(file_path, chunk_size=CHUNK_SIZE):
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(file_path)
+
+    word_count = 0
+    characters = Counter()
+    words = Counter()
+    carry = ''
+    empty = True
+    with open(file_path, 'r') as file:
+        for chunk in iter(lambda: file.read(chunk_size), ''):
+            empty = False
+            characters.update(chunk)
+            chunk = carry + chunk
+            tokens = chunk.split()
+            carry = ''
+            if tokens and not chunk[-1].isspace():
+                carry = tokens.pop()
+            word_count += len(tokens)
+            words.update(normalise_word(token) for token in tokens)
+    if carry:
+        word_count += 1
+        words[normalise_word(carry)] += 1
+    if empty:
+        return None
+
+    words.pop('', None)
+    char_frequency = {char: freq for char, freq in characters.items() if char.isalnum()}
+    return word_count, char_frequency, words
+
+# Parallel mode: ranges of the memory-mapped file are split at ASCII whitespace, which never falls
+# inside a word or a UTF-8 multibyte sequence, and counted in a process pool
+WHITESPACE = re.compile(rb'\s')
+ALNUM_BYTES = bytes(code for code in range(128) if chr(code).isalnum())
+RANGE_BLOCK_SIZE = 4 * 1024 * 1024  # Bytes decoded at a time by count_text_range
+
+def split_text_ranges(file_path, parts):
+    size = os.path.getsize(file_path)
+    bounds = [0]
+    with open(file_path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for i in range(1, parts):
+            match = WHITESPACE.search(mm, max(size * i // parts, bounds[-1]))
+            bounds.append(match.start() if match else size)
+    bounds.append(size)
+    return [(file_path, start, end) for start, end in zip(bounds, bounds[1:]) if start < end]
+
+# Character counts of one block in first-occurrence order, the same order character_frequency produces.
+# Pure ASCII blocks use np.bincount over the raw bytes and np.unique for the first occurrences.
+def count_block_characters(data):
+    if not data.isascii():
+        return {char: freq for char, freq in Counter(data.decode('utf-8')).items() if char.isalnum()}
+    codes = np.frombuffer(data, dtype=np.uint8)
+    counts = np.bincount(codes, minlength=128)
+    present, first = np.unique(codes, return_index=True)
+    keep = np.isin(present, np.frombuffer(ALNUM_BYTES, dtype=np.uint8))
+    present = present[keep][np.argsort(first[keep])]
+    return {chr(code): int(counts[code]) for code in present}
+
+# Worker: counts for one byte range, walked in blocks of about RANGE_BLOCK_SIZE bytes cut at whitespace
+def count_text_range(task):
+    file_path, start, end = task
+    word_count = 0
+    characters = Counter()
+    words = Counter()
+    with open(file_path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        position = start
+        while position < end:
+            block_end = min(position + RANGE_BLOCK_SIZE, end)
+            if block_end < end:
+                match = WHITESPACE.search(mm, block_end, end)
+                block_end = match.start() if match else end
+            data = mm[position:block_end]
+            position = block_end
+            characters.update(count_block_characters(data))
+            tokens = data.decode('utf-8').split()
+            word_count += len(tokens)
+            words.update(normalise_word(token) for token in tokens)
+    return word_count, characters, words
+
+# Same results as analyze_text_file, computed over the mmap'd file by a pool of workers
+def analyze_text_file_parallel(file_path, workers=None):
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(file_path)
+    if os.path.getsize(file_path) == 0:
+        return None
+
+    workers = workers or os.cpu_count() or 1
+    word_count = 0
+    characters = Counter()
+    words = Counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for range_words, range_characters, range_word_frequency in executor.map(count_text_range, split_text_ranges(file_path, workers * 4)):
+            word_count += range_words
+            characters.update(range_characters)
+            words.update(range_word_frequency)
+
+    words.pop('', None)
+    return word_count, dict(characters), words
+
 # Function to get available disk space (in bytes)
 def get_available_disk_space(directory):
     total, used, free = shutil.disk_usage(directory)
     return free
 
-# Function to estimate the size of the output file
-def estimate_output_size(word_count, char_frequency):
-    estimated_size = word_count * 10  # Rough estimate: 10 bytes per word
-    estimated_size += len(char_frequency) * 10  # Rough estimate: 10 bytes per char frequency entry
-    return estimated_size
+# Function to serialise the results into the exact bytes that will be written.
+# 'json' is a compact format for very large frequency tables.
+def format_results(word_count, char_frequency, output_format='text'):
+    if output_format == 'json':
+        return json.dumps({'word_count': word_count, 'char_frequency': char_frequency}, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    lines = [f"Number of words: {word_count}\n", "Character frequencies:\n"]
+    lines.extend(f"{char}: {freq}\n" for char, freq in char_frequency.items())
+    return ''.join(lines).encode('utf-8')
 
-# Function to save results to a file
-def save_results_to_file(output_file, word_count, char_frequency):
+# Function to save results to a file: exact size check, one write to a temp file, atomic rename
+def save_results_to_file(output_file, word_count, char_frequency, output_format='text'):
+    temp_file = output_file + '.tmp'
     try:
+        data = format_results(word_count, char_frequency, output_format)
         output_directory = os.path.dirname(output_file) or '.'
         available_space = get_available_disk_space(output_directory)
-        estimated_size = estimate_output_size(word_count, char_frequency)
 
-        if available_space < estimated_size:
+        if available_space < len(data):
             raise DiskSpaceFullError("Insufficient disk space to save the file.")
 
-        with open(output_file, 'w') as file:
-            file.write(f"Number of words: {word_count}\n")
-            file.write("Character frequencies:\n")
-            for char, freq in char_frequency.items():
-                file.write(f"{char}: {freq}\n")
+        with open(temp_file, 'wb') as file:
+            file.write(data)
+        os.replace(temp_file, output_file)
 
     except DiskSpaceFullError as e:
         logging.error(e.message)
         print(e.message)
     except IOError as e:  # Catching general IO errors that might occur
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
         logging.error("Failed to save the file due to I/O error.")
         print("Failed to save the file due to I/O error.")
 
@@ -102,15 +222,47 @@ def generate_word_cloud(text):
     plt.savefig('Lab-6/wordcloud.jpg')
     plt.show()
 
+# Function to render a word cloud from precomputed word frequencies straight to an image file.
+# Stopwords are dropped first, like WordCloud.generate(text) does, then only the top_k words are used.
+# Nothing is shown on screen, and renders are cached under cache_dir keyed on a hash of the frequency
+# table and the rendering parameters.
+def render_word_cloud(word_frequency, output_file='Lab-6/wordcloud.jpg', top_k=200, width=800, height=400, cache_dir='Lab-6/wordcloud_cache', stopwords=None):
+    stopwords = STOPWORDS if stopwords is None else stopwords
+    top_words = Counter({word: freq for word, freq in word_frequency.items() if word.lower() not in stopwords}).most_common(top_k)
+    if not top_words:
+        return None
+    key = hashlib.sha256(json.dumps({
+        'words': top_words,
+        'width': width,
+        'height': height,
+        'format': os.path.splitext(output_file)[1]
+    }).encode('utf-8')).hexdigest()
+    cached_file = os.path.join(cache_dir, key + os.path.splitext(output_file)[1])
+
+    if not os.path.exists(cached_file):
+        os.makedirs(cache_dir, exist_ok=True)
+        wordcloud = WordCloud(width=width, height=height).generate_from_frequencies(dict(top_words))
+        wordcloud.to_file(cached_file)
+    if os.path.abspath(cached_file) != os.path.abspath(output_file):
+        shutil.copyfile(cached_file, output_file)
+    return output_file
+
 # Main processing function
-def process_text_file(file_path):
-    text = read_file(file_path)
+def process_text_file(file_path, workers=None):
+    try:
+        if workers is not None and workers > 1:
+            results = analyze_text_file_parallel(file_path, workers)
+        else:
+            results = analyze_text_file(file_path)
+    except FileNotFoundError as e:
+        logging.error(str(e))
+        print(str(e))
+        return
 
-    if text:
-        word_count = count_words(text)
-        char_frequency = character_frequency(text)
+    if results:
+        word_count, char_frequency, word_frequency = results
         save_results_to_file('Lab-6/text_processing_output.txt', word_count, char_frequency)
-        generate_word_cloud(text)
+        render_word_cloud(word_frequency)
         print("The inputted text has been processed and the processed data has been saved in files")
 
 # Example usage
@@ -1,11 +1,27 @@
 import csv
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
 from datetime import datetime
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
 import os
 
+# Table style shared by every invoice, built once per process
+INVOICE_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),  # Header background color
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),  # Header text color
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),  # Center align the text
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),  # Font for header row
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),  # Font for other rows
+    ('FONTSIZE', (0, 0), (-1, 0), 14),  # Font size for header
+    ('FONTSIZE', (0, 1), (-1, -1), 12),  # Font size for other rows
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),  # Row background color
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),  # Grid lines for the table
+    ('TOPPADDING', (0, 0), (-1, -1), 10),  # Padding for top
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 10)  # Padding for bottom
+])
+
 # Step 1: Load order data from CSV file with exception handling
 def load_orders(file):
     try:
@@ -37,57 +53,34 @@ def load_orders(file):
     return None
 
 # Step 2: Create PDF with a table layout using ReportLab
-def create_pdf_with_table(order, folder):
-    try:
-        if not os.path.exists(folder):
-            os.makedirs(folder)
-
-        # Path for the PDF file
-        pdf_path = os.path.join(folder, f"invoice_{order['Order ID']}.pdf")
-        doc = SimpleDocTemplate(pdf_path, pagesize=A4)
-
-        # List to store elements (tables, paragraphs, etc.)
-        elements = []
+def build_invoice(order, folder, invoice_date=None):
+    # Path for the PDF file
+    pdf_path = os.path.join(folder, f"invoice_{order['Order ID']}.pdf")
+    doc = SimpleDocTemplate(pdf_path, pagesize=A4)
 
-        # Define styles for the table
-        styles = getSampleStyleSheet()
+    # Table data for the invoice
+    table_data = [
+        ["Invoice Number", f"{order['Order ID']}"],
+        ["Date of Purchase", invoice_date or datetime.now().strftime('%Y-%m-%d')],
+        ["Customer Name", f"{order['Customer Name']}"],
+        ["Product Name", f"{order['Product Name']}"],
+        ["Quantity", f"{order['Quantity']}"],
+        ["Unit Price", f"${order['Unit Price']:.2f}"],
+        ["Total Amount", f"${order['Quantity'] * order['Unit Price']:.2f}"]
+    ]
 
-        # Table data for the invoice
-        table_data = [
-            ["Invoice Number", f"{order['Order ID']}"],
-            ["Date of Purchase", f"{datetime.now().strftime('%Y-%m-%d')}"],
-            ["Customer Name", f"{order['Customer Name']}"],
-            ["Product Name", f"{order['Product Name']}"],
-            ["Quantity", f"{order['Quantity']}"],
-            ["Unit Price", f"${order['Unit Price']:.2f}"],
-            ["Total Amount", f"${order['Quantity'] * order['Unit Price']:.2f}"]
-        ]
+    # Create the table
+    invoice_table = Table(table_data, colWidths=[150, 250])
+    invoice_table.setStyle(INVOICE_TABLE_STYLE)
 
-        # Create the table
-        invoice_table = Table(table_data, colWidths=[150, 250])
-
-        # Table style
-        table_style = TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),  # Header background color
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),  # Header text color
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),  # Center align the text
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),  # Font for header row
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),  # Font for other rows
-            ('FONTSIZE', (0, 0), (-1, 0), 14),  # Font size for header
-            ('FONTSIZE', (0, 1), (-1, -1), 12),  # Font size for other rows
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),  # Row background color
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),  # Grid lines for the table
-            ('TOPPADDING', (0, 0), (-1, -1), 10),  # Padding for top
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 10)  # Padding for bottom
-        ])
-        invoice_table.setStyle(table_style)
-
-        # Add table to elements
-        elements.append(invoice_table)
-
-        # Build the PDF
-        doc.build(elements)
+    # Build the PDF
+    doc.build([invoice_table])
+    return pdf_path
 
+def create_pdf_with_table(order, folder):
+    try:
+        os.makedirs(folder, exist_ok=True)
+        pdf_path = build_invoice(order, folder)
         print(f"Invoice created: {pdf_path}")
 
     except PermissionError:
@@ -95,24 +88,55 @@ def create_pdf_with_table(order, folder):
     except Exception as e:
         print(f"An unexpected error occurred while generating the invoice for order {order['Order ID']}: {e}")
 
+# Worker: render one invoice and report (Order ID, error message or None) instead of printing
+def render_invoice(order, folder, invoice_date):
+    try:
+        build_invoice(order, folder, invoice_date)
+        return order['Order ID'], None
+    except PermissionError:
+        return order['Order ID'], "Permission denied"
+    except Exception as e:
+        return order['Order ID'], str(e)
+
+# Render a batch of invoices across a process pool, returns a list of (Order ID, error) pairs for the failures.
+# Each Order ID maps to one PDF, so repeats of an ID are failed up front and only its first order is rendered.
+def generate_invoice_batch(orders, folder, workers=None, chunksize=32):
+    os.makedirs(folder, exist_ok=True)
+    invoice_date = datetime.now().strftime('%Y-%m-%d')
+    seen = set()
+    unique_orders = []
+    failures = []
+    for order in orders:
+        if order['Order ID'] in seen:
+            failures.append((order['Order ID'], "Duplicate Order ID"))
+        else:
+            seen.add(order['Order ID'])
+            unique_orders.append(order)
+    render = partial(render_invoice, folder=folder, invoice_date=invoice_date)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(render, unique_orders, chunksize=chunksize)
+        failures.extend((order_id, error) for order_id, error in results if error is not None)
+    return failures
+
 # Step 3: Main logic to read orders and generate invoices
-def generate_invoices():
+def generate_invoices(workers=None):
     orders_file = 'Lab-7/orders.csv'
     orders = load_orders(orders_file)
     if orders is None or len(orders) == 0:
         print("No valid orders found to process. Exiting.")
         return
     invoices_folder = 'Lab-7/invoices'
-    for order in orders:
-        try:
-            create_pdf_with_table(order, invoices_folder)
-        except Exception as e:
-            print(f"An error occurred while processing order {order['Order ID']}: {e}")
+    failures = generate_invoice_batch(orders, invoices_folder, workers)
+
+    print(f"Invoices created: {len(orders) - len(failures)} of {len(orders)} in '{invoices_folder}'.")
+    for order_id, error in failures:
+        print(f"Failed to generate invoice for order {order_id}: {error}")
 
-# Run the invoice generation process
-print("Rank Mansi")
-print("22BCP284")
-try:
-    generate_invoices()
-except Exception as e:
-    print(f"An unexpected error occurred in the process: {e}")
+# Run the invoice generation process (guarded so pool workers can import this module)
+if __name__ == "__main__":
+    print("Rank Mansi")
+    print("22BCP284")
+    try:
+        generate_invoices()
+    except Exception as e:
+        print(f"An unexpected error occurred in the process: {e}")